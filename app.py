@@ -1,9 +1,9 @@
 import streamlit as st
-import json
 import os
 from datetime import datetime
 from filter_rule_based import filter_network_log_by_dynamic_url
 from llm import NetworkLogAnalyzer
+from log_archive import load_network_log
 import traceback
 import io
 
@@ -42,7 +42,10 @@ def main():
 
     # File Upload Section
     st.header("1. Upload Network Log")
-    uploaded_file = st.file_uploader("Choose a JSON file", type=['json'])
+    uploaded_file = st.file_uploader(
+        "Choose a network log file (JSON, NDJSON or .ndjson.gz/.ndjson.zst archive)",
+        type=['json', 'ndjson', 'gz', 'zst']
+    )
 
     # Login URL Input Section
     st.header("2. (Optional) Add Login URLs for Filtering")
@@ -73,14 +76,13 @@ def main():
     if uploaded_file is not None and st.button("Start Rule-based Filtering"):
         with st.spinner("Filtering network logs..."):
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filtered_file = f"filtered_network_log_{timestamp}.json"
+            filtered_file = f"filtered_network_log_{timestamp}.ndjson.gz"
             filter_network_log_by_dynamic_url(input_file, filtered_file, extra_keywords=extra_keywords)
             try:
-                with open(filtered_file, 'r', encoding='utf-8') as f:
-                    filtered_data = json.load(f)
-                    st.session_state.filtered_data = filtered_data
-                    st.session_state.filtered_file = filtered_file
-                    st.success(f"✅ Filtered {len(filtered_data)} requests")
+                filtered_data = load_network_log(filtered_file)
+                st.session_state.filtered_data = filtered_data
+                st.session_state.filtered_file = filtered_file
+                st.success(f"✅ Filtered {len(filtered_data)} requests")
             except Exception as e:
                 st.error(f"Error reading filtered data: {str(e)}")
                 st.session_state.filtered_data = None
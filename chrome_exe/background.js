@@ -12,13 +12,14 @@ function saveLogsForTab(tabId) {
     console.log(`Preparing to save ${logsToSave.length} log entries for tab ${tabId}.`);
 
     try {
-      const dataString = JSON.stringify(logsToSave, null, 2); // Pretty print JSON
+      // Compact NDJSON (one event per line); use log_archive.py to compress it further
+      const dataString = logsToSave.map((entry) => JSON.stringify(entry)).join('\n') + '\n';
       // Use a Data URL instead of Blob URL
-      const dataUrl = 'data:application/json;charset=utf-8,' + encodeURIComponent(dataString);
+      const dataUrl = 'data:application/x-ndjson;charset=utf-8,' + encodeURIComponent(dataString);
       
       chrome.downloads.download({
         url: dataUrl,
-        filename: `network_log_tab_${tabId}_${Date.now()}.json`, // Unique filename
+        filename: `network_log_tab_${tabId}_${Date.now()}.ndjson`, // Unique filename
         saveAs: true // Prompts user for location
       }, (downloadId) => {
         if (chrome.runtime.lastError) {
@@ -1,10 +1,11 @@
 """This is the additional criterial into the network analysis"""
-import json
 import re
 
 from urllib.parse import urlparse
 from typing import List, Dict, Set
 
+from log_archive import load_network_log, save_network_log
+
 
 def check_priority_criterial(event: dict) -> bool:
     """
@@ -63,13 +64,12 @@ def filter_network_log_by_dynamic_url(
     auth_endpoints_found = set()
 
     try:
-        with open(input_filename, "r", encoding="utf-8") as f:
-            log_data = json.load(f)
+        log_data = load_network_log(input_filename)
     except FileNotFoundError:
         print(f"❌ File not found: {input_filename}")
         return
-    except json.JSONDecodeError:
-        print(f"❌ Failed to decode JSON: {input_filename}")
+    except ValueError as e:
+        print(f"❌ Failed to load '{input_filename}': {str(e)}")
         return
 
     # Compile the regex pattern once for efficiency
@@ -121,8 +121,7 @@ def filter_network_log_by_dynamic_url(
                 continue
 
     try:
-        with open(output_filename, "w", encoding="utf-8") as f_out:
-            json.dump(filtered_log, f_out, indent=2, ensure_ascii=False)
+        save_network_log(filtered_log, output_filename)
         print(f"✅ Filtered log saved to '{output_filename}' with {len(filtered_log)} entries.")
         
         # Print summary of found authentication endpoints
@@ -7,6 +7,8 @@ import sys
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
+from log_archive import load_network_log, save_network_log
+
 class NetworkLogAnalyzer:
     def __init__(self, api_key: Optional[str] = None):
         """Initialize the analyzer with optional API key"""
@@ -20,10 +22,9 @@ class NetworkLogAnalyzer:
         self.temperature = 1
 
     def load_log_data(self, input_file: str) -> List[Dict[str, Any]]:
-        """Load and validate network log data from JSON file"""
+        """Load and validate network log data from a JSON, NDJSON or archived (.gz/.zst) file"""
         try:
-            with open(input_file, "r", encoding="utf-8") as f:
-                log_data = json.load(f)
+            log_data = load_network_log(input_file)
             if not isinstance(log_data, list):
                 raise ValueError("Log data must be a list of network events")
             return log_data
@@ -38,10 +39,9 @@ class NetworkLogAnalyzer:
             sys.exit(1)
 
     def save_results(self, data: List[Dict[str, Any]], output_file: str) -> None:
-        """Save analysis results to JSON file"""
+        """Save analysis results to JSON file (archived when the name ends in .gz/.zst)"""
         try:
-            with open(output_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
+            save_network_log(data, output_file)
             print(f"✅ Saved results to '{output_file}'")
         except Exception as e:
             print(f"❌ Error saving results: {str(e)}")
@@ -153,7 +153,7 @@ class NetworkLogAnalyzer:
 
 def main():
     parser = argparse.ArgumentParser(description="Analyze network logs using Claude AI")
-    parser.add_argument("--input", "-i", required=True, help="Input JSON file containing network logs")
+    parser.add_argument("--input", "-i", required=True, help="Input file containing network logs (JSON, NDJSON or .ndjson.gz/.ndjson.zst archive)")
     parser.add_argument("--output", "-o", help="Output JSON file for filtered results")
     parser.add_argument("--mode", "-m", choices=["keys", "objects"], default="keys",
                       help="Analysis mode: 'keys' for request IDs, 'objects' for full objects")
@@ -0,0 +1,514 @@
+"""Compact on-disk format for network captures and filter outputs.
+
+Archives are NDJSON (one event per line) split into independently compressed
+frames, so a single frame can be decoded without inflating the whole file.
+The first frame is a header holding a string dictionary for the repeated
+header names/values and the byte offsets of every event frame:
+
+    [header frame] {"format": "netlog-archive", "version": 2, "codec": ...,
+                    "strings": [...], "frames": [[offset, length, count], ...]}
+    [frame 1]      [[0, "data", "request", "headers"], ...]\\n
+                   {"type": "Network.requestWillBeSent", ...}\\n ...
+    [frame 2]      ...
+
+The first line of each event frame lists the paths (event index within the
+frame, then keys/list indexes) of every ``headers`` object in that frame.
+Those objects are stored as a flat ``[name, value, name, value, ...]`` list
+whose items are either an index into ``strings`` or the literal string, so the
+reader only touches the headers it has to expand. Offsets are relative to the end of the
+header frame.
+
+``load_network_log`` reads archives, plain JSON arrays, NDJSON and gzip/zstd
+compressed JSON transparently; ``save_network_log`` picks the format from the
+file extension. JSON/NDJSON files come from outside this module and are
+always parsed with the ``json`` module. Archive frames are parsed with
+``orjson`` when it is installed; frames holding values orjson cannot represent
+exactly (integers beyond 64 bits, NaN/Infinity, lone surrogates) are listed in
+the header's ``json_frames`` and parsed with ``json`` instead.
+"""
+import argparse
+import gzip
+import json
+import math
+import os
+import sys
+import zlib
+from collections import Counter
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd is optional, gzip is always available
+    zstandard = None
+
+try:
+    import orjson
+except ImportError:  # optional faster parser for archive frames
+    orjson = None
+
+ARCHIVE_FORMAT = "netlog-archive"
+ARCHIVE_VERSION = 2
+FRAME_EVENTS = 256
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+CODEC_EXTENSIONS = {".gz": "gzip", ".zst": "zstd"}
+
+READ_SIZE = 64 * 1024
+
+_DECOMPRESS_ERRORS = (zlib.error, EOFError) + ((zstandard.ZstdError,) if zstandard else ())
+
+# Range of integers orjson parses exactly
+_ORJSON_INT_MIN = -2 ** 63
+_ORJSON_INT_MAX = 2 ** 64 - 1
+
+
+def codec_for_path(path: str) -> Optional[str]:
+    """Return the compression codec implied by the file extension, if any"""
+    return CODEC_EXTENSIONS.get(os.path.splitext(path)[1].lower())
+
+
+def _require_zstd():
+    if zstandard is None:
+        raise ValueError("zstd support requires the 'zstandard' package (pip install zstandard)")
+
+
+def _compress(data: bytes, codec: str) -> bytes:
+    if codec == "gzip":
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    if codec == "zstd":
+        _require_zstd()
+        return zstandard.ZstdCompressor(level=19).compress(data)
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def _decompressobj(codec: str):
+    if codec == "gzip":
+        return zlib.decompressobj(wbits=31)
+    if codec == "zstd":
+        _require_zstd()
+        return zstandard.ZstdDecompressor().decompressobj()
+    raise ValueError(f"Unknown codec: {codec}")
+
+
+def _decompress_frame(data: bytes, codec: str) -> bytes:
+    try:
+        d = _decompressobj(codec)
+        out = d.decompress(data)
+        if not d.eof:
+            raise ValueError("Truncated compressed frame")
+        return out
+    except _DECOMPRESS_ERRORS as e:
+        raise ValueError(f"Corrupt compressed frame: {e}") from e
+
+
+def _detect_codec(prefix: bytes) -> Optional[str]:
+    if prefix.startswith(GZIP_MAGIC):
+        return "gzip"
+    if prefix.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+# --- Header string dictionary ---
+
+def _is_header_map(value: Any) -> bool:
+    return isinstance(value, dict) and all(isinstance(v, str) for v in value.values())
+
+
+def _collect_header_strings(node: Any, counts: Counter) -> None:
+    if isinstance(node, dict):
+        for key, value in node.items():
+            if key == "headers" and _is_header_map(value):
+                for name, header_value in value.items():
+                    counts[name] += 1
+                    counts[header_value] += 1
+            else:
+                _collect_header_strings(value, counts)
+    elif isinstance(node, list):
+        for item in node:
+            _collect_header_strings(item, counts)
+
+
+def build_string_table(events: List[Dict[str, Any]]) -> List[str]:
+    """Header names/values that repeat, most frequent first"""
+    counts = Counter()
+    for event in events:
+        _collect_header_strings(event, counts)
+    return [s for s, n in counts.most_common() if n > 1]
+
+
+def _encode_event(node: Any, index: Dict[str, int], path: List[Any], paths: List[List[Any]],
+                  inexact: List[Any]) -> Any:
+    """
+    Copy ``node`` with header maps swapped for pair lists, recording their
+    paths; values orjson would not read back exactly are added to ``inexact``
+    """
+    if isinstance(node, dict):
+        encoded = {}
+        for key, value in node.items():
+            if key == "headers" and _is_header_map(value):
+                paths.append(path + [key])
+                # Flat [name, value, name, value, ...] so the reader builds no per-pair lists
+                encoded[key] = [
+                    index.get(item, item)
+                    for pair in value.items() for item in pair
+                ]
+            else:
+                encoded[key] = _encode_event(value, index, path + [key], paths, inexact)
+        return encoded
+    if isinstance(node, list):
+        return [_encode_event(item, index, path + [i], paths, inexact) for i, item in enumerate(node)]
+    if node.__class__ is int and not _ORJSON_INT_MIN <= node <= _ORJSON_INT_MAX:
+        inexact.append(node)
+    elif node.__class__ is float and not math.isfinite(node):
+        inexact.append(node)
+    return node
+
+
+def _expand_headers(events: List[Any], paths: List[List[Any]], strings: List[str]) -> None:
+    """Turn the flat name/value lists at ``paths`` back into header dicts, in place"""
+    try:
+        for path in paths:
+            node = events
+            for key in path[:-1]:
+                node = node[key]
+            flat = [strings[item] if item.__class__ is int else item for item in node[path[-1]]]
+            if len(flat) % 2:
+                raise ValueError("odd number of header items")
+            node[path[-1]] = dict(zip(flat[::2], flat[1::2]))
+    except (IndexError, KeyError, TypeError, ValueError) as e:
+        raise ValueError(f"Corrupt archive frame: bad header reference ({e!r})") from e
+
+
+# --- Writing ---
+
+def _dumps(obj: Any, escaped: Optional[List[Any]] = None) -> bytes:
+    """Compact UTF-8 JSON; ``obj`` is added to ``escaped`` if it needed \\u escapes"""
+    try:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    except UnicodeEncodeError:
+        # Lone surrogates (JSON.stringify emits them) have no UTF-8 form; escape them
+        if escaped is not None:
+            escaped.append(obj)
+        return json.dumps(obj, separators=(",", ":")).encode("ascii")
+
+
+def encode_archive(events: List[Dict[str, Any]], codec: str = "gzip",
+                   frame_events: int = FRAME_EVENTS) -> bytes:
+    """Serialize events into the framed, dictionary-compressed archive format"""
+    strings = build_string_table(events)
+    index = {s: i for i, s in enumerate(strings)}
+
+    frames = []
+    frame_table = []
+    json_frames = []
+    offset = 0
+    for start in range(0, len(events), frame_events):
+        chunk = events[start:start + frame_events]
+        paths = []
+        inexact = []
+        lines = [_dumps(_encode_event(event, index, [i], paths, inexact), inexact)
+                 for i, event in enumerate(chunk)]
+        text = b"\n".join([_dumps(paths)] + lines) + b"\n"
+        if inexact:
+            json_frames.append(len(frame_table))
+        frame = _compress(text, codec)
+        frames.append(frame)
+        frame_table.append([offset, len(frame), len(chunk)])
+        offset += len(frame)
+
+    header = {
+        "format": ARCHIVE_FORMAT,
+        "version": ARCHIVE_VERSION,
+        "codec": codec,
+        "strings": strings,
+        "frames": frame_table,
+        "json_frames": json_frames,
+    }
+    return _compress(_dumps(header) + b"\n", codec) + b"".join(frames)
+
+
+def save_network_log(data: List[Dict[str, Any]], output_file: str) -> None:
+    """
+    Save events, choosing the format from the extension:
+    - ``.gz`` / ``.zst``: framed archive (see module docstring)
+    - ``.ndjson``: uncompressed NDJSON
+    - anything else: compact JSON array
+    """
+    codec = codec_for_path(output_file)
+    if codec:
+        with open(output_file, "wb") as f:
+            f.write(encode_archive(data, codec))
+    elif output_file.lower().endswith(".ndjson"):
+        with open(output_file, "wb") as f:
+            for event in data:
+                f.write(_dumps(event) + b"\n")
+    else:
+        with open(output_file, "wb") as f:
+            f.write(_dumps(data))
+
+
+# --- Reading ---
+
+def _split_header(raw: bytes, codec: str) -> Tuple[bytes, bytes]:
+    """Decompress the first frame, returning it and the bytes that follow it"""
+    try:
+        d = _decompressobj(codec)
+        first = d.decompress(raw)
+        if not d.eof:
+            raise ValueError("Truncated compressed frame")
+        return first, d.unused_data
+    except _DECOMPRESS_ERRORS as e:
+        raise ValueError(f"Corrupt compressed data: {e}") from e
+
+
+def _parse_header(first_frame: bytes, codec: str) -> Optional[Dict[str, Any]]:
+    """Return the archive header, or None if this is plain compressed JSON"""
+    line = first_frame.split(b"\n", 1)[0]
+    if not line.startswith(b'{"format":'):
+        return None
+    header = json.loads(line)
+    if header.get("format") != ARCHIVE_FORMAT:
+        return None
+    if header.get("version") != ARCHIVE_VERSION:
+        raise ValueError(f"Unsupported archive version: {header.get('version')}")
+    if header.get("codec") != codec:
+        raise ValueError(f"Archive header codec {header.get('codec')!r} does not match the data ({codec})")
+    strings = header.get("strings")
+    frames = header.get("frames")
+    if not isinstance(strings, list) or not all(isinstance(s, str) for s in strings):
+        raise ValueError("Archive header has an invalid string table")
+    if not isinstance(frames, list) or not all(
+        isinstance(entry, list) and len(entry) == 3
+        and all(isinstance(n, int) and n >= 0 for n in entry)
+        for entry in frames
+    ):
+        raise ValueError("Archive header has an invalid frame table")
+    json_frames = header.get("json_frames", [])
+    if not isinstance(json_frames, list) or not all(isinstance(n, int) for n in json_frames):
+        raise ValueError("Archive header has an invalid json_frames list")
+    header["json_frames"] = set(json_frames)
+    return header
+
+
+def _read_header(f) -> Tuple[Optional[str], Optional[Dict[str, Any]], bytes, int]:
+    """
+    Decompress the first frame of an open file.
+    Returns (codec, header, first frame, offset just past it); codec is None
+    for uncompressed input and header is None for plain compressed JSON.
+    """
+    codec = _detect_codec(f.read(4))
+    f.seek(0)
+    if codec is None:
+        return None, None, b"", 0
+    d = _decompressobj(codec)
+    chunks = []
+    consumed = 0
+    try:
+        while not d.eof:
+            chunk = f.read(READ_SIZE)
+            if not chunk:
+                raise ValueError("Truncated compressed data")
+            chunks.append(d.decompress(chunk))
+            consumed += len(chunk)
+    except _DECOMPRESS_ERRORS as e:
+        raise ValueError(f"Corrupt compressed data: {e}") from e
+    first = b"".join(chunks)
+    return codec, _parse_header(first, codec), first, consumed - len(d.unused_data)
+
+
+def _parse_json_text(text: bytes, ndjson: bool) -> Any:
+    """
+    Parse a JSON or NDJSON document with the json module. Without ``ndjson``
+    a single JSON value is returned as-is (callers reject non-lists); input
+    is only treated as NDJSON if it is not one JSON value.
+    """
+    if not ndjson:
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError as e:
+            if not e.msg.startswith("Extra data"):
+                raise
+    lines = [line for line in text.splitlines() if line.strip()]
+    return json.loads(b"[" + b",".join(lines) + b"]")
+
+
+def _loads_frame(text: bytes, exact: bool) -> Any:
+    if orjson is not None and not exact:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # e.g. written by another tool; the json module is more lenient
+    return json.loads(text)
+
+
+def _decode_frame(data: bytes, header: Dict[str, Any], frame: int, count: int) -> List[Dict[str, Any]]:
+    text = _decompress_frame(data, header["codec"]).rstrip(b"\n")
+    # One parse per frame is much faster than one per line; json.dumps
+    # escapes newlines inside strings, so they only separate records here
+    items = _loads_frame(b"[" + text.replace(b"\n", b",") + b"]", frame in header["json_frames"])
+    if not items or not isinstance(items[0], list) or len(items) - 1 != count:
+        raise ValueError("Corrupt archive frame: unexpected layout")
+    paths = items[0]
+    events = items[1:]
+    if paths:
+        _expand_headers(events, paths, header["strings"])
+    return events
+
+
+def _read_frame(f, header: Dict[str, Any], header_end: int, frame: int) -> List[Dict[str, Any]]:
+    offset, length, count = header["frames"][frame]
+    f.seek(header_end + offset)
+    data = f.read(length)
+    if len(data) != length:
+        raise ValueError("Truncated archive: frame extends past end of file")
+    return _decode_frame(data, header, frame, count)
+
+
+def _is_ndjson_name(input_file: str) -> bool:
+    name = input_file.lower()
+    for ext in CODEC_EXTENSIONS:
+        if name.endswith(ext):
+            name = name[:-len(ext)]
+    return name.endswith(".ndjson")
+
+
+def _load(input_file: str) -> Tuple[Any, Optional[Iterator[Dict[str, Any]]]]:
+    """(parsed JSON document, None) for JSON/NDJSON input, (None, event iterator) for archives"""
+    f = open(input_file, "rb")
+    try:
+        codec, header, first, header_end = _read_header(f)
+        if header is None:
+            if codec is None:
+                text = f.read()
+            else:
+                # Plain JSON/NDJSON that was simply compressed (possibly multi-member)
+                parts = [first]
+                f.seek(header_end)
+                rest = f.read()
+                while rest:
+                    part, rest = _split_header(rest, codec)
+                    parts.append(part)
+                text = b"".join(parts)
+            f.close()
+            return _parse_json_text(text, _is_ndjson_name(input_file)), None
+    except BaseException:
+        f.close()
+        raise
+
+    def frames():
+        with f:
+            for frame in range(len(header["frames"])):
+                yield from _read_frame(f, header, header_end, frame)
+    return None, frames()
+
+
+def iter_network_log(input_file: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield events from any supported format. Archives are read from disk one
+    frame at a time; JSON/NDJSON input (compressed or not) is parsed in one go.
+    Raises ValueError if a JSON document is not a list.
+    """
+    data, events = _load(input_file)
+    if events is None:
+        if not isinstance(data, list):
+            raise ValueError("Log data must be a list of network events")
+        events = iter(data)
+    return events
+
+
+def load_network_log(input_file: str) -> Any:
+    """
+    Load network events from any supported format.
+    Like json.load, a JSON document that is not a list is returned as parsed
+    for the caller to reject. Raises FileNotFoundError for missing files and
+    ValueError (including json.JSONDecodeError) for malformed content.
+    """
+    data, events = _load(input_file)
+    return data if events is None else list(events)
+
+
+def read_archive_frame(input_file: str, frame: int) -> List[Dict[str, Any]]:
+    """Decode a single frame of an archive without inflating the others"""
+    with open(input_file, "rb") as f:
+        codec, header, _first, header_end = _read_header(f)
+        if codec is None:
+            raise ValueError(f"Not a compressed archive: {input_file}")
+        if header is None:
+            raise ValueError(f"Not a network log archive: {input_file}")
+        if not 0 <= frame < len(header["frames"]):
+            raise ValueError(f"Frame {frame} out of range (archive has {len(header['frames'])} frames)")
+        return _read_frame(f, header, header_end, frame)
+
+
+# --- Converter ---
+
+def archive_filename(input_file: str, codec: str = "gzip") -> str:
+    """network_log.json -> network_log.ndjson.gz"""
+    base = input_file
+    for ext in (".gz", ".zst", ".json", ".ndjson"):
+        if base.lower().endswith(ext):
+            base = base[:-len(ext)]
+    suffix = {"gzip": ".gz", "zstd": ".zst"}[codec]
+    return f"{base}.ndjson{suffix}"
+
+
+def same_file(a: str, b: str) -> bool:
+    """True if both paths name the same file (also when it does not exist yet)"""
+    if os.path.exists(a) and os.path.exists(b):
+        return os.path.samefile(a, b)
+    return os.path.realpath(a) == os.path.realpath(b)
+
+
+def convert_file(input_file: str, output_file: Optional[str] = None, codec: str = "gzip") -> str:
+    """Convert an existing capture/filter output to the archive format"""
+    output_file = output_file or archive_filename(input_file, codec)
+    if codec_for_path(output_file) != codec:
+        raise ValueError(f"Output file '{output_file}' does not match codec '{codec}'")
+    if same_file(input_file, output_file):
+        raise ValueError(f"Output file '{output_file}' is the input file")
+    events = load_network_log(input_file)
+    if not isinstance(events, list):
+        raise ValueError("Log data must be a list of network events")
+    save_network_log(events, output_file)
+    # Verify the round trip before reporting success
+    if load_network_log(output_file) != events:
+        raise ValueError(f"Round-trip mismatch for '{output_file}'")
+    return output_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert network logs to the compressed archive format")
+    parser.add_argument("inputs", nargs="+", help="JSON/NDJSON network log files to convert")
+    parser.add_argument("--output", "-o", help="Output file (only with a single input)")
+    parser.add_argument("--codec", "-c", choices=["gzip", "zstd"], default="gzip",
+                      help="Compression codec (zstd requires the 'zstandard' package)")
+    parser.add_argument("--remove", action="store_true", help="Delete the original file after conversion")
+
+    args = parser.parse_args()
+    if args.output and len(args.inputs) > 1:
+        parser.error("--output can only be used with a single input file")
+
+    for input_file in args.inputs:
+        output_file = args.output or archive_filename(input_file, args.codec)
+        if same_file(input_file, output_file):
+            # Already converted (e.g. a.ndjson.gz); converting in place and
+            # then --remove would delete the only copy
+            print(f"⚠️  Skipping '{input_file}': output would overwrite the input")
+            continue
+        try:
+            output_file = convert_file(input_file, output_file, args.codec)
+        except (OSError, ValueError) as e:
+            print(f"❌ Failed to convert '{input_file}': {str(e)}")
+            sys.exit(1)
+        before = os.path.getsize(input_file)
+        after = os.path.getsize(output_file)
+        print(f"✅ {input_file} -> {output_file} ({before:,} -> {after:,} bytes, {before / max(after, 1):.1f}x)")
+        if args.remove and not same_file(input_file, output_file):
+            os.remove(input_file)
+
+
+if __name__ == "__main__":
+    main()
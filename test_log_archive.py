@@ -0,0 +1,291 @@
+import gzip
+import json
+
+import pytest
+
+import log_archive
+from log_archive import (
+    archive_filename,
+    convert_file,
+    encode_archive,
+    load_network_log,
+    read_archive_frame,
+    save_network_log,
+)
+
+
+def make_events(n):
+    events = []
+    for i in range(n):
+        events.append({
+            "type": "Network.requestWillBeSent",
+            "timestamp": f"2025-06-04T06:24:{i % 60:02d}.000Z",
+            "data": {
+                "requestId": str(i),
+                "request": {
+                    "url": f"https://example.com/api/{i}",
+                    "method": "POST" if i % 2 else "GET",
+                    "headers": {
+                        "User-Agent": "Mozilla/5.0",
+                        "Content-Type": "application/json",
+                        "X-Request": f"unique-{i}",
+                    },
+                },
+                "redirectResponse": {"headers": {"Location": "/next", "Set-Cookie": "a=1\nb=2"}},
+            },
+        })
+    return events
+
+
+def write_frames(path, header, frames):
+    """Write an archive by hand from a header dict and raw frame payloads"""
+    compressed = [gzip.compress(frame) for frame in frames]
+    offset = 0
+    header = dict(header, frames=[])
+    for frame, payload in zip(compressed, frames):
+        count = payload.count(b"\n") - 1
+        header["frames"].append([offset, len(frame), count])
+        offset += len(frame)
+    path.write_bytes(gzip.compress((json.dumps(header) + "\n").encode()) + b"".join(compressed))
+
+
+HEADER = {"format": log_archive.ARCHIVE_FORMAT, "version": log_archive.ARCHIVE_VERSION,
+          "codec": "gzip", "strings": ["Accept"]}
+
+
+def test_round_trip_json_array(tmp_path):
+    events = make_events(600)
+    src = tmp_path / "capture.json"
+    src.write_text(json.dumps(events, indent=2), encoding="utf-8")
+
+    out = convert_file(str(src))
+
+    assert out == str(tmp_path / "capture.ndjson.gz")
+    assert load_network_log(out) == events
+    # Key order survives, not just equality
+    assert json.dumps(load_network_log(out)) == json.dumps(events)
+    assert len(log_archive.build_string_table(events)) > 0
+
+
+def test_round_trip_ndjson(tmp_path):
+    events = make_events(10)
+    src = tmp_path / "capture.ndjson"
+    save_network_log(events, str(src))
+
+    assert src.read_text(encoding="utf-8").count("\n") == 10
+    assert load_network_log(str(src)) == events
+    assert load_network_log(convert_file(str(src))) == events
+
+
+def test_load_plain_gzip_json(tmp_path):
+    events = make_events(5)
+    src = tmp_path / "capture.json.gz"
+    src.write_bytes(gzip.compress(json.dumps(events).encode()))
+
+    assert load_network_log(str(src)) == events
+    assert load_network_log(convert_file(str(src))) == events
+
+
+def test_save_compact_json(tmp_path):
+    events = make_events(3)
+    out = tmp_path / "filtered.json"
+    save_network_log(events, str(out))
+
+    assert "\n" not in out.read_text(encoding="utf-8")
+    assert json.loads(out.read_text(encoding="utf-8")) == events
+
+
+def test_empty_archive(tmp_path):
+    out = tmp_path / "empty.ndjson.gz"
+    save_network_log([], str(out))
+    assert load_network_log(str(out)) == []
+
+
+def test_read_archive_frame_matches_slice(tmp_path):
+    events = make_events(700)
+    out = tmp_path / "capture.ndjson.gz"
+    save_network_log(events, str(out))
+    loaded = load_network_log(str(out))
+    size = log_archive.FRAME_EVENTS
+
+    for frame in range(3):
+        assert read_archive_frame(str(out), frame) == loaded[frame * size:(frame + 1) * size]
+    with pytest.raises(ValueError, match="out of range"):
+        read_archive_frame(str(out), 99)
+    with pytest.raises(ValueError, match="out of range"):
+        read_archive_frame(str(out), -1)
+
+
+def test_literal_reserved_looking_keys_round_trip(tmp_path):
+    events = [
+        {"headers$": [[0, 1]]},
+        {"data": {"headers": [["not", "a", "map"]], "other": {"headers": {"n": 1}}}},
+        {"data": {"headers": {}}},
+    ]
+    out = tmp_path / "odd.ndjson.gz"
+    save_network_log(events, str(out))
+    assert load_network_log(str(out)) == events
+
+
+def test_truncated_archive(tmp_path):
+    out = tmp_path / "capture.ndjson.gz"
+    data = encode_archive(make_events(600))
+    out.write_bytes(data[:len(data) - 100])
+    with pytest.raises(ValueError):
+        load_network_log(str(out))
+
+    out.write_bytes(data[:10])
+    with pytest.raises(ValueError):
+        load_network_log(str(out))
+
+
+def test_corrupt_frame(tmp_path):
+    out = tmp_path / "capture.ndjson.gz"
+    data = bytearray(encode_archive(make_events(300)))
+    data[-40] ^= 0xFF
+    out.write_bytes(bytes(data))
+    with pytest.raises(ValueError):
+        load_network_log(str(out))
+
+
+@pytest.mark.parametrize("frame", [
+    b'[[0, "headers"]]\n{"headers": [0, 5]}\n',      # string index out of range
+    b'[[0, "headers"]]\n{"headers": [0]}\n',         # odd name/value list
+    b'[[0, "missing"]]\n{"headers": [0, 0]}\n',      # path to a missing key
+    b'[[3, "headers"]]\n{"headers": [0, 0]}\n',      # path to a missing event
+    b'{"headers": [0, 0]}\n{"a": 1}\n',              # no path line
+])
+def test_bad_header_references(tmp_path, frame):
+    out = tmp_path / "bad.ndjson.gz"
+    write_frames(out, HEADER, [frame])
+    with pytest.raises(ValueError):
+        load_network_log(str(out))
+
+
+@pytest.mark.parametrize("change", [
+    {"codec": None},
+    {"codec": "zstd"},
+    {"version": 1},
+    {"strings": "Accept"},
+])
+def test_bad_archive_header(tmp_path, change):
+    out = tmp_path / "bad.ndjson.gz"
+    header = {k: v for k, v in dict(HEADER, **change).items() if v is not None}
+    write_frames(out, header, [b'[[0, "headers"]]\n{"headers": [0, 0]}\n'])
+    with pytest.raises(ValueError):
+        load_network_log(str(out))
+
+
+def test_bad_frame_table(tmp_path):
+    out = tmp_path / "bad.ndjson.gz"
+    header = dict(HEADER, frames=[[0, 10]])
+    out.write_bytes(gzip.compress((json.dumps(header) + "\n").encode()))
+    with pytest.raises(ValueError):
+        load_network_log(str(out))
+    with pytest.raises(ValueError):
+        read_archive_frame(str(out), 0)
+
+
+def test_zstd_without_package(tmp_path, monkeypatch):
+    monkeypatch.setattr(log_archive, "zstandard", None)
+    with pytest.raises(ValueError, match="zstandard"):
+        save_network_log(make_events(1), str(tmp_path / "capture.ndjson.zst"))
+
+
+def test_archive_filename():
+    assert archive_filename("network_log.json") == "network_log.ndjson.gz"
+    assert archive_filename("network_log.ndjson", "zstd") == "network_log.ndjson.zst"
+
+
+def test_convert_refuses_to_overwrite_input(tmp_path):
+    archive = tmp_path / "a.ndjson.gz"
+    save_network_log(make_events(3), str(archive))
+    with pytest.raises(ValueError, match="is the input"):
+        convert_file(str(archive))
+    with pytest.raises(ValueError, match="is the input"):
+        convert_file(str(archive), str(tmp_path / "." / "a.ndjson.gz"))
+    assert load_network_log(str(archive)) == make_events(3)
+
+
+@pytest.mark.parametrize("extra_args", [[], ["-o", "a.ndjson.gz"]])
+def test_main_remove_keeps_only_copy(tmp_path, monkeypatch, extra_args):
+    archive = tmp_path / "a.ndjson.gz"
+    save_network_log(make_events(3), str(archive))
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("sys.argv", ["log_archive.py", "--remove", "a.ndjson.gz"] + extra_args)
+
+    log_archive.main()
+
+    assert load_network_log(str(archive)) == make_events(3)
+
+
+def test_main_remove_deletes_converted_original(tmp_path, monkeypatch):
+    src = tmp_path / "a.json"
+    save_network_log(make_events(3), str(src))
+    monkeypatch.setattr("sys.argv", ["log_archive.py", "--remove", str(src)])
+
+    log_archive.main()
+
+    assert not src.exists()
+    assert load_network_log(str(tmp_path / "a.ndjson.gz")) == make_events(3)
+
+
+INEXACT_JSON = b'[{"a": "\\ud800abc", "n": 123456789012345678901234567890, "f": NaN}]'
+
+
+def test_external_json_parsed_exactly(tmp_path):
+    src = tmp_path / "capture.json"
+    src.write_bytes(INEXACT_JSON)
+    events = load_network_log(str(src))
+
+    assert events[0]["a"] == "\ud800abc"
+    assert events[0]["n"] == 123456789012345678901234567890
+    assert isinstance(events[0]["n"], int)
+
+
+@pytest.mark.parametrize("name", ["out.json", "out.ndjson", "out.ndjson.gz"])
+def test_inexact_values_round_trip(tmp_path, name):
+    events = json.loads(INEXACT_JSON) + make_events(300)
+    out = tmp_path / name
+    save_network_log(events, str(out))
+    loaded = load_network_log(str(out))
+
+    assert loaded[0]["a"] == "\ud800abc"
+    assert loaded[0]["n"] == 123456789012345678901234567890
+    assert isinstance(loaded[0]["n"], int)
+    assert loaded[1:] == events[1:]
+
+
+def test_inexact_frames_are_flagged(tmp_path):
+    events = make_events(300) + json.loads(INEXACT_JSON)
+    out = tmp_path / "capture.ndjson.gz"
+    save_network_log(events, str(out))
+    with open(out, "rb") as f:
+        _codec, header, _first, _end = log_archive._read_header(f)
+
+    # Only the second frame holds the inexact values
+    assert header["json_frames"] == {1}
+
+
+def test_single_json_object_is_not_a_list(tmp_path):
+    src = tmp_path / "capture.json"
+    src.write_text('{"a": 1}', encoding="utf-8")
+
+    assert load_network_log(str(src)) == {"a": 1}
+    with pytest.raises(ValueError, match="must be a list"):
+        list(log_archive.iter_network_log(str(src)))
+    with pytest.raises(ValueError, match="must be a list"):
+        convert_file(str(src))
+
+
+def test_ndjson_detection(tmp_path):
+    single = tmp_path / "one.ndjson"
+    single.write_text('{"a": 1}\n', encoding="utf-8")
+    multi = tmp_path / "many.json"
+    multi.write_text('{"a": 1}\n\n{"a": 2}\n', encoding="utf-8")
+    pretty = tmp_path / "pretty.json"
+    pretty.write_text('{\n  "a": 1\n}\n', encoding="utf-8")
+
+    assert load_network_log(str(single)) == [{"a": 1}]
+    assert load_network_log(str(multi)) == [{"a": 1}, {"a": 2}]
+    assert load_network_log(str(pretty)) == {"a": 1}